@@ -0,0 +1,181 @@
+import re, sys, json, time, argparse, threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Iterable, Iterator, List
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+import perf
+import sql_agent
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across all threads (rate <= 0 disables it)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+# Nobody reviews generated SQL in batch mode, so only statements that can't change data are run
+READ_ONLY_STATEMENTS = ("select", "show", "explain", "describe", "desc", "with")
+_LEADING_COMMENTS = re.compile(r"^\s*(?:(?:--|#)[^\n]*\n|/\*.*?\*/|\s+)*", re.S)
+
+def is_read_only(sql: str) -> bool:
+    body = _LEADING_COMMENTS.sub("", sql).strip().rstrip(";").strip()
+    if ";" in body:
+        # More than one statement
+        return False
+    words = body.lstrip("(").split(None, 1)
+    return bool(words) and words[0].lower() in READ_ONLY_STATEMENTS
+
+def read_questions(path: str) -> Iterator[dict]:
+    """
+    Each JSONL line is {"question": ..., "id": optional} or a bare JSON string.
+    A line that is neither comes back as {"id": line number, "error": ...} instead of stopping the batch.
+    """
+    with (sys.stdin if path == "-" else open(path, encoding="utf-8")) as f:
+        for i, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"id": i, "error": f"Invalid JSON: {e}"}
+                continue
+            if isinstance(item, str):
+                item = {"question": item}
+            if not isinstance(item, dict) or not isinstance(item.get("question"), str):
+                yield {"id": i, "error": "Expected a JSON string or an object with a string 'question'"}
+                continue
+            item.setdefault("id", i)
+            yield item
+
+@perf.timed()
+def execute_query(engine: Engine, sql: str, sample_rows: int = 5) -> dict:
+    """Run `sql` and return its columns, the first `sample_rows` rows and the total row count."""
+    with engine.connect() as conn:
+        result = conn.execute(text(sql))
+        if not result.returns_rows:
+            return {"columns": [], "row_count": result.rowcount, "sample": []}
+        columns = list(result.keys())
+        sample: List[list] = []
+        row_count = 0
+        for row in result:
+            if row_count < sample_rows:
+                sample.append(list(row))
+            row_count += 1
+    perf.count("query_rows", row_count)
+    return {"columns": columns, "row_count": row_count, "sample": sample}
+
+def answer(item: dict, schema_text: str, provider: str, engine: Engine | None,
+           limiter: RateLimiter, sample_rows: int) -> dict:
+    """Answer one question. Never raises: any failure ends up in the result's "error" field."""
+    if "error" in item:
+        # Rejected by read_questions
+        return {"id": item.get("id"), "error": item["error"]}
+    out = {"id": item.get("id"), "question": item.get("question")}
+    try:
+        limiter.wait()
+        t0 = time.perf_counter()
+        sql = sql_agent.generate_sql(item["question"], schema_text, provider=provider)
+        out["sql"] = sql
+        out["generate_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        if sql.startswith("-- Error"):
+            out["error"] = sql
+            return out
+        if engine is None:
+            return out
+        if not is_read_only(sql):
+            out["error"] = "Refused: batch mode only runs read-only queries (SELECT/SHOW/EXPLAIN/DESCRIBE/WITH)"
+            return out
+        t0 = time.perf_counter()
+        try:
+            out.update(execute_query(engine, sql, sample_rows))
+        except Exception as e:
+            out["error"] = f"Error executing query: {e}"
+        out["execute_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    except Exception as e:
+        out["error"] = f"Error answering question: {e}"
+    return out
+
+def run_batch(questions: Iterable[dict], schema_text: str, provider: str = "gemini",
+              engine: Engine | None = None, concurrency: int = 4, rate: float = 0.0,
+              sample_rows: int = 5) -> Iterator[dict]:
+    """
+    Answer `questions` with at most `concurrency` in flight, yielding each result as soon as it
+    is done (completion order, not input order). With engine=None the SQL is generated but not run.
+    """
+    limiter = RateLimiter(rate)
+    questions = iter(questions)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for item in questions:
+            pending.add(pool.submit(answer, item, schema_text, provider, engine, limiter, sample_rows))
+            # Keep a bounded window of work so huge input files are never fully queued
+            if len(pending) >= concurrency * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield fut.result()
+
+def main():
+    ap = argparse.ArgumentParser(description="Answer a JSONL file of natural-language questions with the SQL agent")
+    ap.add_argument("input", help="JSONL file of questions ('-' for stdin)")
+    ap.add_argument("-o", "--output", default="-", help="JSONL file for results (default stdout)")
+    ap.add_argument("--provider", choices=sorted(sql_agent.PROVIDERS), default="gemini",
+                    help="LLM provider; 'mock' needs no API key (default gemini)")
+    ap.add_argument("--concurrency", type=int, default=4, help="Questions in flight at once (default 4)")
+    ap.add_argument("--rate", type=float, default=0.0, help="Max LLM requests per second (default unlimited)")
+    ap.add_argument("--sample-rows", type=int, default=5, help="Rows of each result to include (default 5)")
+    ap.add_argument("--schema-file", help="Use this schema text instead of reading it from MYSQL_DB")
+    ap.add_argument("--no-execute", action="store_true", help="Only generate SQL, don't run it")
+    ap.add_argument("--perf", metavar="FILE", help="Record stage timings and write them to FILE (.prom = Prometheus text, else JSON lines)")
+    args = ap.parse_args()
+    if args.concurrency < 1:
+        ap.error("--concurrency must be at least 1")
+    if args.sample_rows < 0:
+        ap.error("--sample-rows must not be negative")
+
+    if args.perf:
+        perf.enable()
+
+    needs_db = not args.no_execute or not args.schema_file
+    # Read-only sessions back up is_read_only(), e.g. for WITH ... DELETE
+    engine = sql_agent.pooled_engine(pool_size=args.concurrency, read_only=True) if needs_db else None
+    if args.schema_file:
+        with open(args.schema_file, encoding="utf-8") as f:
+            schema_text = f.read()
+    else:
+        schema_text = sql_agent.format_schema(sql_agent.fetch_schema(engine))
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        results = run_batch(
+            read_questions(args.input), schema_text, provider=args.provider,
+            engine=None if args.no_execute else engine, concurrency=args.concurrency,
+            rate=args.rate, sample_rows=args.sample_rows,
+        )
+        for res in results:
+            # default=str covers Decimal / datetime values in sample rows
+            out.write(json.dumps(res, default=str) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if args.perf:
+            perf.write_report(args.perf)
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,33 @@ import os, random
 from datetime import datetime
 from decimal import Decimal
 from typing import Any, Dict, Callable, Optional, Set, Tuple
-from faker import Faker
+import perf
 
 _LOCALE = os.getenv("FAKER_LOCALE", "en_US")
 _SEED = int(os.getenv("SEED","42"))
-faker = Faker(_LOCALE)
-faker.seed_instance(_SEED)
 random.seed(_SEED)
 
+# Faker is slow to import and build, so it is created on first use (see get_faker)
+faker = None
+
+def get_faker():
+    global faker
+    if faker is None:
+        # Timed on its own so the one-off build doesn't skew value_for's numbers
+        with perf.span("faker_init"):
+            from faker import Faker
+            faker = Faker(_LOCALE)
+            faker.seed_instance(_SEED)
+    return faker
+
 # Registry to ensure uniqueness when requested
 _UNIQUE_REG: Dict[Tuple[str,str], Set[Any]] = {}
 
 def reset_uniques():
     """Clear uniqueness registry and Faker's internal unique cache."""
     _UNIQUE_REG.clear()
+    if faker is None:
+        return
     try:
         faker.unique.clear()
     except Exception:
@@ -64,6 +77,12 @@ def _ensure_unique(table: Optional[str], column: str, value_fn, max_tries=20):
     return candidate
 
 def value_for(column: str, data_type: str, *, unique: bool=False, table: Optional[str]=None):
+    if faker is None:
+        get_faker()
+    return _value_for(column, data_type, unique=unique, table=table)
+
+@perf.timed("value_for")
+def _value_for(column: str, data_type: str, *, unique: bool, table: Optional[str]):
     c, dt = column.lower(), data_type.lower()
 
     # Semantic generators
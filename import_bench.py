@@ -0,0 +1,65 @@
+import os, sys, argparse, subprocess
+from typing import Dict, List, Tuple
+
+# Modules that must never load just because the seeder CLI was imported;
+# they are pulled in lazily by the feature that needs them.
+HEAVY_MODULES = ["faker", "pandas", "pyarrow", "google.generativeai", "openai"]
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+def measure(module: str = "seed") -> Dict[str, Tuple[int, int]]:
+    """
+    Import `module` in a fresh interpreter under `python -X importtime`.
+    Returns {imported module: (self_us, cumulative_us)}.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=here, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in proc.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cum_us))
+    return times
+
+def heavy_imports(times: Dict[str, Tuple[int, int]]) -> List[str]:
+    return [m for m in HEAVY_MODULES if m in times]
+
+def check(module: str = "seed", budget_ms: float = DEFAULT_BUDGET_MS,
+          times: Dict[str, Tuple[int, int]] | None = None) -> List[str]:
+    """Return a list of budget violations (empty when the import path is within budget)."""
+    times = times or measure(module)
+    problems = [f"{m} is imported eagerly" for m in heavy_imports(times)]
+    total_ms = times[module][1] / 1000
+    if total_ms > budget_ms:
+        problems.append(f"import {module} took {total_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+    return problems
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-time benchmark for the seeder CLI (python -X importtime)")
+    ap.add_argument("--module", default="seed", help="Module to import (default seed)")
+    ap.add_argument("--top", type=int, default=15, help="Show the N slowest imports by cumulative time")
+    ap.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                    help="Fail when the cumulative import time exceeds this (default IMPORT_BUDGET_MS or 1500)")
+    args = ap.parse_args()
+
+    times = measure(args.module)
+    slowest = sorted(times.items(), key=lambda kv: kv[1][1], reverse=True)[:args.top]
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for name, (self_us, cum_us) in slowest:
+        print(f"{cum_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    problems = check(args.module, args.budget_ms, times)
+    if problems:
+        for p in problems:
+            print(f"FAIL: {p}")
+        sys.exit(1)
+    print(f"OK: import {args.module} within {args.budget_ms:.0f} ms, no heavy modules loaded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import os, json, time, threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List
+
+# Instrumentation is off unless PERF_ENABLED=1 or enable() is called.
+# When off, a timed function costs one flag check on top of the plain call.
+_enabled = os.getenv("PERF_ENABLED", "0") == "1"
+_tracer = None
+
+@dataclass
+class Stat:
+    count: int = 0
+    total: float = 0.0
+    min: float = float("inf")
+    max: float = 0.0
+
+    def add(self, secs: float):
+        self.count += 1
+        self.total += secs
+        if secs < self.min:
+            self.min = secs
+        if secs > self.max:
+            self.max = secs
+
+class Recorder:
+    """Per-stage timers and named counters. Safe to share between threads."""
+
+    def __init__(self):
+        self.timers: Dict[str, Stat] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, secs: float):
+        with self._lock:
+            self.timers.setdefault(name, Stat()).add(secs)
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+
+    def rows(self) -> List[dict]:
+        """One row per stage, latencies in milliseconds (for tables and the JSON log)."""
+        with self._lock:
+            return [
+                {
+                    "stage": name,
+                    "calls": s.count,
+                    "total_ms": round(s.total * 1000, 3),
+                    "avg_ms": round(s.total / s.count * 1000, 3),
+                    "min_ms": round(s.min * 1000, 3),
+                    "max_ms": round(s.max * 1000, 3),
+                }
+                for name, s in sorted(self.timers.items())
+            ]
+
+    def to_json(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        return {"ts": datetime.now().isoformat(timespec="seconds"), "stages": self.rows(), "counters": counters}
+
+    def to_prometheus(self, prefix: str = "sql_agent") -> str:
+        with self._lock:
+            timers = sorted(self.timers.items())
+            counters = sorted(self.counters.items())
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for name, s in timers:
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {s.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {s.total:.6f}')
+        lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+        for name, s in timers:
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{name}"}} {s.max:.6f}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, n in counters:
+            lines.append(f'{prefix}_events_total{{name="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+_default = Recorder()
+_current: ContextVar[Recorder] = ContextVar("perf_recorder", default=_default)
+
+def enable(on: bool = True, otel: bool | None = None):
+    """
+    Turn instrumentation on/off. With otel=True (or PERF_OTEL=1) every timed
+    stage is also emitted as an OpenTelemetry span, if opentelemetry is installed.
+    """
+    global _enabled, _tracer
+    _enabled = on
+    if otel is None:
+        otel = os.getenv("PERF_OTEL", "0") == "1"
+    if on and otel and _tracer is None:
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer("sql_agent")
+        except ImportError:
+            _tracer = None
+
+def enabled() -> bool:
+    return _enabled
+
+def recorder() -> Recorder:
+    """The recorder for the current context (a Streamlit session, or the process default)."""
+    return _current.get()
+
+def use(rec: Recorder):
+    """Send measurements made in the current context to `rec`."""
+    _current.set(rec)
+
+@contextmanager
+def span(name: str):
+    if not _enabled:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        if _tracer is not None:
+            with _tracer.start_as_current_span(name):
+                yield
+        else:
+            yield
+    finally:
+        _current.get().observe(name, time.perf_counter() - t0)
+
+def timed(name: str | None = None):
+    """Decorator recording the wall time of every call under `name` (defaults to the function name)."""
+    def deco(fn):
+        stage = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            if _tracer is not None:
+                with span(stage):
+                    return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.get().observe(stage, time.perf_counter() - t0)
+        return wrapper
+    return deco
+
+def count(name: str, n: int = 1):
+    if _enabled:
+        _current.get().incr(name, n)
+
+def write_report(path: str, rec: Recorder | None = None):
+    """Write `.prom` files in Prometheus text format; anything else is appended as a JSON line."""
+    rec = rec or recorder()
+    if path.endswith(".prom"):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(rec.to_prometheus())
+    else:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(rec.to_json()) + "\n")
@@ -0,0 +1,117 @@
+import os, tempfile, weakref
+from dataclasses import dataclass
+from typing import Any, List, Mapping, Sequence
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Compact storage for query results kept in st.session_state: Arrow tables with
+# downcast numbers and dictionary-encoded strings; big ones are spilled to a
+# memory-mapped Arrow file so the OS can page them out.
+
+SPILL_BYTES = int(float(os.getenv("RESULT_SPILL_MB", "32")) * 1024 * 1024)
+SPILL_DIR = os.getenv("RESULT_SPILL_DIR") or None
+
+_INT_TYPES = [(pa.int8(), 8), (pa.int16(), 16), (pa.int32(), 32)]
+
+@dataclass(eq=False)
+class StoredResult:
+    table: pa.Table | None = None
+    error: str | None = None
+    # Arrow IPC file backing `table` when it was spilled to disk
+    path: str | None = None
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows if self.table is not None else 0
+
+    @property
+    def resident_bytes(self) -> int:
+        """Bytes held in process memory (a memory-mapped table only costs its page cache)."""
+        if self.table is None or self.path:
+            return 0
+        return self.table.nbytes
+
+    @property
+    def mapped_bytes(self) -> int:
+        return self.table.nbytes if self.table is not None and self.path else 0
+
+def _compact_column(arr: pa.Array) -> pa.Array:
+    t = arr.type
+    if len(arr) == arr.null_count:
+        return arr
+    if pa.types.is_integer(t) and pa.types.is_signed_integer(t):
+        mm = pc.min_max(arr)
+        lo, hi = mm["min"].as_py(), mm["max"].as_py()
+        for typ, bits in _INT_TYPES:
+            if bits >= t.bit_width:
+                break
+            if -(2 ** (bits - 1)) <= lo and hi < 2 ** (bits - 1):
+                return arr.cast(typ)
+    elif pa.types.is_float64(t):
+        # Only keep float32 when every value survives the round trip exactly
+        try:
+            f32 = arr.cast(pa.float32())
+        except pa.ArrowInvalid:
+            return arr
+        if pc.all(pc.equal(f32.cast(pa.float64()), arr)).as_py():
+            return f32
+    elif pa.types.is_string(t) or pa.types.is_large_string(t):
+        # Repeated values (enums, statuses, names...) shrink to one copy plus small indices
+        if pc.count_distinct(arr).as_py() <= len(arr) // 2:
+            enc = arr.dictionary_encode()
+            for typ, bits in _INT_TYPES:
+                if len(enc.dictionary) < 2 ** (bits - 1):
+                    return enc.cast(pa.dictionary(typ, enc.type.value_type))
+            return enc
+    return arr
+
+def compact(table: pa.Table) -> pa.Table:
+    table = table.combine_chunks()
+    arrays = [_compact_column(col.chunk(0)) if col.num_chunks else col for col in table.columns]
+    return pa.Table.from_arrays(arrays, names=table.column_names)
+
+def from_rows(columns: Sequence[str], rows: Sequence[Sequence[Any]]) -> pa.Table:
+    cols = list(zip(*rows)) if rows else [[] for _ in columns]
+    arrays = []
+    for vals in cols:
+        try:
+            arrays.append(pa.array(vals))
+        except (pa.ArrowInvalid, pa.ArrowTypeError, OverflowError):
+            # Mixed/unsupported Python types: fall back to text
+            arrays.append(pa.array([None if v is None else str(v) for v in vals], type=pa.string()))
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+def _spill(table: pa.Table) -> StoredResult:
+    fd, path = tempfile.mkstemp(prefix="sqlagent-", suffix=".arrow", dir=SPILL_DIR)
+    os.close(fd)
+    with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    mapped = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    res = StoredResult(table=mapped, path=path)
+    # Remove the file once the session drops the result
+    weakref.finalize(res, os.remove, path)
+    return res
+
+def store(table: pa.Table) -> StoredResult:
+    table = compact(table)
+    if table.nbytes > SPILL_BYTES:
+        return _spill(table)
+    return StoredResult(table=table)
+
+def error_result(message: str, detail: str) -> StoredResult:
+    return StoredResult(error=f"{message}: {detail}")
+
+def session_usage(state: Mapping[str, Any]) -> dict:
+    """Resident and memory-mapped bytes of every StoredResult in a session state mapping."""
+    stored: List[StoredResult] = [v for v in state.values() if isinstance(v, StoredResult)]
+    return {
+        "results": len(stored),
+        "resident_bytes": sum(r.resident_bytes for r in stored),
+        "mapped_bytes": sum(r.mapped_bytes for r in stored),
+    }
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
@@ -3,18 +3,19 @@ from typing import Dict, List, Tuple
 from dataclasses import dataclass
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
+import perf
 
 load_dotenv()
 
-def mysql_url(db: str | None = None) -> str:
+def mysql_url(db: str | None = None, driver: str = "mysqlconnector") -> str:
     host = os.getenv("MYSQL_HOST","127.0.0.1")
     port = int(os.getenv("MYSQL_PORT","3306"))
     user = os.getenv("MYSQL_USER","root")
     pwd  = os.getenv("MYSQL_PASSWORD","")
     if db:
-        return f"mysql+mysqlconnector://{user}:{pwd}@{host}:{port}/{db}"
+        return f"mysql+{driver}://{user}:{pwd}@{host}:{port}/{db}"
     else:
-        return f"mysql+mysqlconnector://{user}:{pwd}@{host}:{port}"
+        return f"mysql+{driver}://{user}:{pwd}@{host}:{port}"
 
 @dataclass
 class TableInfo:
@@ -38,6 +39,7 @@ def get_schema_tables(schema: str) -> List[str]:
         rows = c.execute(text("SHOW FULL TABLES WHERE Table_type='BASE TABLE';")).fetchall()
     return [r[0] for r in rows]
 
+@perf.timed()
 def load_table_info(schema: str, table: str) -> TableInfo:
     eng = create_engine(mysql_url(schema))
     with eng.connect() as c:
@@ -5,6 +5,7 @@ from sqlalchemy.engine import Engine
 from dotenv import load_dotenv
 from schema_introspect import get_schema_tables, load_table_info, dependency_order, mysql_url
 from faker_factories import value_for, fix_enum, reset_uniques
+import perf
 
 load_dotenv()
 
@@ -33,6 +34,7 @@ def sample_fk_value(conn, ref_schema: str, ref_table: str, ref_col: str):
     key = (ref_schema, ref_table, ref_col)
     vals = _fk_cache.get(key)
     if not vals:
+        perf.count("fk_cache_miss")
         rows = conn.execute(text(f"SELECT `{ref_col}` FROM `{ref_schema}`.`{ref_table}` ORDER BY `{ref_col}` LIMIT 1000")).fetchall()
         vals = [r[0] for r in rows]
         _fk_cache[key] = vals
@@ -40,6 +42,7 @@ def sample_fk_value(conn, ref_schema: str, ref_table: str, ref_col: str):
         return None
     return random.choice(vals)
 
+@perf.timed()
 def seed_table(conn, schema: str, table: str, nrows: int):
     info = load_table_info(schema, table)
 
@@ -91,6 +94,7 @@ def seed_table(conn, schema: str, table: str, nrows: int):
         sql = f"INSERT INTO `{schema}`.`{table}` ({cols}) VALUES ({placeholders})"
         conn.execute(text(sql), row)
         inserted += 1
+    perf.count("rows_inserted", inserted)
     return inserted
 
 def main():
@@ -100,8 +104,56 @@ def main():
     ap.add_argument("--rows", type=int, default=200, help="Rows per table (default 200)")
     ap.add_argument("--truncate", action="store_true", help="Truncate table(s) before insert")
     ap.add_argument("--dry-run", action="store_true", help="Only show dependency order plan, no inserts")
+    snap = ap.add_mutually_exclusive_group()
+    snap.add_argument("--snapshot", metavar="DIR", help="Dump the schema's current data to DIR instead of seeding")
+    snap.add_argument("--restore", metavar="DIR", help="Bulk-load a snapshot from DIR instead of seeding")
+    ap.add_argument("--format", choices=["parquet", "csv"], default="parquet", help="Snapshot file format (default parquet)")
+    ap.add_argument("--workers", type=int, default=4, help="Parallel table loaders for --restore (default 4)")
+    ap.add_argument("--perf", metavar="FILE", help="Record stage timings and write them to FILE (.prom = Prometheus text, else JSON lines)")
     args = ap.parse_args()
 
+    if args.perf:
+        perf.enable()
+    try:
+        run(args)
+    finally:
+        if args.perf:
+            perf.write_report(args.perf)
+            for r in perf.recorder().rows():
+                print(f"[perf] {r['stage']}: {r['calls']} calls, {r['total_ms']} ms total, {r['avg_ms']} ms avg")
+
+def run(args):
+    tables = [args.table] if args.table else None
+
+    if args.snapshot:
+        if args.table and args.table not in get_schema_tables(args.schema):
+            raise SystemExit(f"error: No table {args.table} in {args.schema}")
+        if args.dry_run:
+            order = dependency_order(args.schema, tables or get_schema_tables(args.schema))
+            print("Snapshot plan (no files written):")
+            print(json.dumps({"schema": args.schema, "snapshot_dir": args.snapshot, "tables_in_order": order}, indent=2))
+            return
+        from snapshot import snapshot_schema
+        manifest = snapshot_schema(args.schema, args.snapshot, tables, fmt=args.format)
+        for t in manifest["tables"]:
+            print(f"[{args.schema}.{t['name']}] saved {t['rows']} rows -> {t['file']}")
+        return
+
+    if args.restore:
+        from snapshot import load_manifest, restore_plan, restore_schema
+        try:
+            levels = restore_plan(load_manifest(args.restore), tables)
+        except ValueError as e:
+            raise SystemExit(f"error: {e}")
+        if args.dry_run:
+            print("Restore plan (levels load in order, tables within a level in parallel; nothing truncated):")
+            print(json.dumps({"schema": args.schema, "snapshot_dir": args.restore, "levels": levels}, indent=2))
+            return
+        counts = restore_schema(args.restore, args.schema, tables, workers=args.workers)
+        for t, count in counts.items():
+            print(f"[{args.schema}.{t}] restored {count} rows")
+        return
+
     engine = get_engine(None)
     with engine.begin() as conn:
         tables = [args.table] if args.table else get_schema_tables(args.schema)
@@ -0,0 +1,259 @@
+import os, json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from sqlalchemy import create_engine, text
+import perf
+from schema_introspect import TableInfo, get_schema_tables, load_table_info, dependency_order, mysql_url
+
+MANIFEST = "manifest.json"
+BATCH_ROWS = 50_000
+
+# MySQL DATA_TYPE -> Arrow type (decimals are resolved per column, see arrow_schema)
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    "tinyint": pa.int64(), "smallint": pa.int64(), "mediumint": pa.int64(),
+    "int": pa.int64(), "integer": pa.int64(), "bigint": pa.int64(), "year": pa.int64(),
+    "float": pa.float32(), "double": pa.float64(), "real": pa.float64(),
+    "date": pa.date32(),
+    "datetime": pa.timestamp("us"), "timestamp": pa.timestamp("us"),
+    "binary": pa.binary(), "varbinary": pa.binary(), "bit": pa.binary(),
+    "tinyblob": pa.binary(), "blob": pa.binary(), "mediumblob": pa.binary(), "longblob": pa.binary(),
+}
+
+def _time_str(v):
+    """MySQL TIME comes back as timedelta; store it as a string MySQL can parse back."""
+    if not isinstance(v, timedelta):
+        return v
+    secs = v.total_seconds()
+    sign = "-" if secs < 0 else ""
+    secs = abs(secs)
+    h, rem = divmod(int(secs), 3600)
+    m, s = divmod(rem, 60)
+    return f"{sign}{h:02d}:{m:02d}:{s:02d}.{abs(v).microseconds:06d}"
+
+def decimal_specs(conn, schema: str, table: str) -> Dict[str, List[int]]:
+    rows = conn.execute(text("""
+        SELECT COLUMN_NAME, NUMERIC_PRECISION, NUMERIC_SCALE
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA=:s AND TABLE_NAME=:t AND DATA_TYPE='decimal'
+    """), {"s": schema, "t": table}).fetchall()
+    return {r[0]: [int(r[1]), int(r[2])] for r in rows}
+
+def unsigned_bigints(conn, schema: str, table: str) -> List[str]:
+    """BIGINT UNSIGNED columns; their values can exceed int64, so they need uint64."""
+    rows = conn.execute(text("""
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA=:s AND TABLE_NAME=:t AND DATA_TYPE='bigint' AND COLUMN_TYPE LIKE '%unsigned%'
+    """), {"s": schema, "t": table}).fetchall()
+    return [r[0] for r in rows]
+
+def arrow_schema(info: TableInfo, decimals: Dict[str, List[int]], unsigned: List[str] = ()) -> pa.Schema:
+    fields = []
+    for (c, t, nullable, _, _) in info.columns:
+        t = t.lower()
+        if c in unsigned:
+            typ = pa.uint64()
+        elif t == "decimal":
+            p, s = decimals.get(c, [38, 10])
+            typ = pa.decimal128(p, s) if p <= 38 else pa.decimal256(p, s)
+        else:
+            # varchar/char/text/enum/set/json/time all round-trip as strings
+            typ = ARROW_TYPES.get(t, pa.string())
+        fields.append(pa.field(c, typ, nullable=True))
+    return pa.schema(fields)
+
+def _record_batch(rows, schema: pa.Schema, time_cols: set) -> pa.RecordBatch:
+    cols = list(zip(*rows))
+    arrays = []
+    for i, f in enumerate(schema):
+        vals = cols[i]
+        if f.name in time_cols:
+            vals = [_time_str(v) for v in vals]
+        elif pa.types.is_string(f.type):
+            vals = [v if v is None or isinstance(v, str) else str(v) for v in vals]
+        arrays.append(pa.array(vals, type=f.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _csv_schema(schema: pa.Schema) -> pa.Schema:
+    """CSV only carries UTF-8 text, so binary columns are stored hex-encoded as strings."""
+    return pa.schema([pa.field(f.name, pa.string()) if pa.types.is_binary(f.type) else f for f in schema])
+
+def _hex_encode(batch: pa.RecordBatch, csv_schema: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for col, f in zip(batch.columns, csv_schema):
+        if pa.types.is_binary(col.type):
+            col = pa.array([None if v is None else v.hex() for v in col.to_pylist()], type=pa.string())
+        arrays.append(col)
+    return pa.RecordBatch.from_arrays(arrays, schema=csv_schema)
+
+def _hex_decode(batch: pa.RecordBatch, schema: pa.Schema) -> pa.RecordBatch:
+    arrays = []
+    for col, f in zip(batch.columns, schema):
+        if pa.types.is_binary(f.type):
+            col = pa.array([None if v is None else bytes.fromhex(v) for v in col.to_pylist()], type=pa.binary())
+        arrays.append(col)
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+class _CsvWriter:
+    def __init__(self, writer: pacsv.CSVWriter, csv_schema: pa.Schema):
+        self._writer = writer
+        self._schema = csv_schema
+
+    def write_batch(self, batch: pa.RecordBatch):
+        self._writer.write_batch(_hex_encode(batch, self._schema))
+
+def _open_writer(stack: ExitStack, path: str, schema: pa.Schema, fmt: str):
+    if fmt == "parquet":
+        return stack.enter_context(pq.ParquetWriter(path, schema, compression="zstd", use_dictionary=True))
+    sink = stack.enter_context(pa.CompressedOutputStream(path, "gzip"))
+    # Quote every non-null value so empty strings and NULLs stay distinguishable
+    opts = pacsv.WriteOptions(quoting_style="all_valid")
+    csv_schema = _csv_schema(schema)
+    return _CsvWriter(stack.enter_context(pacsv.CSVWriter(sink, csv_schema, write_options=opts)), csv_schema)
+
+@perf.timed()
+def snapshot_table(conn, schema: str, info: TableInfo, out_dir: str, fmt: str, batch_rows: int = BATCH_ROWS) -> dict:
+    decimals = decimal_specs(conn, schema, info.name)
+    unsigned = unsigned_bigints(conn, schema, info.name)
+    arrow = arrow_schema(info, decimals, unsigned)
+    time_cols = {c for (c, t, _, _, _) in info.columns if t.lower() == "time"}
+    fname = f"{info.name}.parquet" if fmt == "parquet" else f"{info.name}.csv.gz"
+
+    cols = ", ".join([f"`{c}`" for (c, _, _, _, _) in info.columns])
+    # Server-side cursor: rows are pulled from MySQL in batches instead of buffered whole
+    result = conn.execution_options(stream_results=True).execute(
+        text(f"SELECT {cols} FROM `{schema}`.`{info.name}`")
+    )
+    rows = 0
+    with ExitStack() as stack:
+        writer = _open_writer(stack, os.path.join(out_dir, fname), arrow, fmt)
+        for part in result.partitions(batch_rows):
+            writer.write_batch(_record_batch(part, arrow, time_cols))
+            rows += len(part)
+    return {"name": info.name, "file": fname, "rows": rows, "decimals": decimals, "unsigned": unsigned, "info": asdict(info)}
+
+def snapshot_schema(schema: str, out_dir: str, tables: List[str] | None = None, fmt: str = "parquet",
+                    batch_rows: int = BATCH_ROWS) -> dict:
+    """
+    Dump every table of `schema` into `out_dir` (one Parquet or gzipped CSV file per table)
+    plus a manifest holding the TableInfo metadata and the FK-safe table order.
+    """
+    if fmt not in ("parquet", "csv"):
+        raise ValueError(f"Unsupported snapshot format: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+    tables = tables or get_schema_tables(schema)
+    order = dependency_order(schema, tables)
+
+    # PyMySQL supports server-side cursors; mysql-connector buffers the full result client side
+    eng = create_engine(mysql_url(schema, driver="pymysql"))
+    entries = []
+    with eng.connect() as conn:
+        for t in order:
+            entries.append(snapshot_table(conn, schema, load_table_info(schema, t), out_dir, fmt, batch_rows))
+
+    manifest = {
+        "schema": schema,
+        "format": fmt,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "order": order,
+        "tables": entries,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def load_levels(order: List[str], infos: Dict[str, TableInfo]) -> List[List[str]]:
+    """
+    Group tables into levels: every table's parents sit in an earlier level,
+    so all tables inside one level can be loaded at the same time.
+    """
+    level: Dict[str, int] = {}
+    for t in order:
+        parents = [rt for (_, rs, rt, _) in infos[t].fks
+                   if rs == infos[t].schema and rt != t and rt in level]
+        level[t] = 1 + max((level[p] for p in parents), default=-1)
+    levels: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+    for t in order:
+        levels[level[t]].append(t)
+    return levels
+
+def _read_batches(path: str, arrow: pa.Schema, fmt: str, batch_rows: int):
+    if fmt == "parquet":
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_rows)
+        return
+    reader = pacsv.open_csv(
+        pa.input_stream(path, compression="gzip"),
+        # A NULL row of a single-column table is written as a blank line; keep it
+        parse_options=pacsv.ParseOptions(ignore_empty_lines=False),
+        convert_options=pacsv.ConvertOptions(
+            column_types=_csv_schema(arrow), strings_can_be_null=True, quoted_strings_can_be_null=False
+        ),
+    )
+    for batch in reader:
+        yield _hex_decode(batch, arrow)
+
+@perf.timed()
+def restore_table(eng, schema: str, entry: dict, in_dir: str, fmt: str, batch_rows: int = BATCH_ROWS) -> int:
+    info = TableInfo(**entry["info"])
+    arrow = arrow_schema(info, entry.get("decimals", {}), entry.get("unsigned", []))
+    insert_cols = [c for (c, _, _, _, _) in info.columns]
+
+    # AUTO_INCREMENT ids are inserted verbatim so child FK values keep pointing at the right rows
+    cols = ", ".join([f"`{c}`" for c in insert_cols])
+    placeholders = ", ".join([f":{c}" for c in insert_cols])
+    stmt = text(f"INSERT INTO `{schema}`.`{info.name}` ({cols}) VALUES ({placeholders})")
+
+    restored = 0
+    with eng.begin() as conn:
+        conn.execute(text("SET FOREIGN_KEY_CHECKS=0;"))
+        conn.execute(text("SET UNIQUE_CHECKS=0;"))
+        conn.execute(text(f"TRUNCATE TABLE `{schema}`.`{info.name}`;"))
+        for batch in _read_batches(os.path.join(in_dir, entry["file"]), arrow, fmt, batch_rows):
+            rows = batch.to_pylist()
+            if rows:
+                conn.execute(stmt, rows)
+                restored += len(rows)
+        conn.execute(text("SET UNIQUE_CHECKS=1;"))
+        conn.execute(text("SET FOREIGN_KEY_CHECKS=1;"))
+    return restored
+
+def load_manifest(in_dir: str) -> dict:
+    with open(os.path.join(in_dir, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+def restore_plan(manifest: dict, tables: List[str] | None = None) -> List[List[str]]:
+    """Load levels for the snapshot, limited to `tables` when given."""
+    entries = {e["name"]: e for e in manifest["tables"]}
+    missing = [t for t in (tables or []) if t not in entries]
+    if missing:
+        raise ValueError(f"Not in snapshot: {', '.join(missing)}")
+    order = [t for t in manifest["order"] if not tables or t in tables]
+    infos = {t: TableInfo(**entries[t]["info"]) for t in order}
+    return load_levels(order, infos)
+
+def restore_schema(in_dir: str, schema: str | None = None, tables: List[str] | None = None,
+                   workers: int = 4, batch_rows: int = BATCH_ROWS) -> Dict[str, int]:
+    """
+    Bulk-load a snapshot written by snapshot_schema back into MySQL (only `tables`, if given).
+    Tables are loaded level by level in FK order; tables within a level run in parallel.
+    """
+    manifest = load_manifest(in_dir)
+    schema = schema or manifest["schema"]
+    fmt = manifest["format"]
+    entries = {e["name"]: e for e in manifest["tables"]}
+    levels = restore_plan(manifest, tables)
+
+    eng = create_engine(mysql_url(schema), pool_size=max(workers, 1))
+    counts: Dict[str, int] = {}
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for level in levels:
+            futures = {t: pool.submit(restore_table, eng, schema, entries[t], in_dir, fmt, batch_rows) for t in level}
+            for t in level:
+                counts[t] = futures[t].result()
+    return counts
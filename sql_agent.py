@@ -0,0 +1,135 @@
+import os, time, threading
+from typing import Dict, List
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+import perf
+
+# Shared agent logic (schema prompt + NL->SQL providers) used by the Streamlit apps and batch.py.
+# The LLM SDKs are imported on first use only.
+
+load_dotenv()
+
+def agent_url() -> str:
+    MYSQL_HOST = os.getenv("MYSQL_HOST")
+    MYSQL_PORT = os.getenv("MYSQL_PORT")
+    MYSQL_USER = os.getenv("MYSQL_USER")
+    MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
+    MYSQL_DB = os.getenv("MYSQL_DB")
+    return f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
+
+def pooled_engine(pool_size: int = 5, read_only: bool = False) -> Engine:
+    """
+    One engine whose connection pool is shared by all worker threads.
+    With read_only=True every pooled connection is put in a read-only session.
+    """
+    engine = create_engine(agent_url(), pool_size=pool_size, max_overflow=0, pool_pre_ping=True)
+    if read_only:
+        @event.listens_for(engine, "connect")
+        def _read_only_session(dbapi_conn, _):
+            with dbapi_conn.cursor() as cur:
+                cur.execute("SET SESSION TRANSACTION READ ONLY")
+    return engine
+
+@perf.timed()
+def fetch_schema(engine: Engine) -> Dict[str, List[str]]:
+    with engine.connect() as conn:
+        tables = conn.execute(text("SHOW TABLES")).fetchall()
+        schema_dict = {}
+        for t in tables:
+            table_name = t[0]
+            cols = conn.execute(text(f"SHOW COLUMNS FROM `{table_name}`")).fetchall()
+            schema_dict[table_name] = [c[0] for c in cols]
+        return schema_dict
+
+def format_schema(schema: Dict[str, List[str]]) -> str:
+    return "\n".join([f"{t}: {', '.join(cols)}" for t, cols in schema.items()])
+
+_sdk_lock = threading.Lock()
+_genai = None
+_openai = None
+
+def _get_genai():
+    global _genai
+    with _sdk_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _genai = genai
+    return _genai
+
+def _get_openai():
+    global _openai
+    with _sdk_lock:
+        if _openai is None:
+            import openai
+            openai.api_key = os.getenv("OPENAI_API_KEY")
+            _openai = openai
+    return _openai
+
+def gemini_sql(user_query: str, system_prompt: str) -> str:
+    # This is the prompt template we'll send to the model
+    prompt = f"""
+    You are a world-class MySQL expert who translates natural language to SQL.
+    Based on the following database schema, write a valid MySQL query to answer the user's request.
+
+    Database Schema:
+    ---
+    {system_prompt}
+    ---
+
+    User Query: "{user_query}"
+
+    SQL Query:
+    """
+    # Initialize the Gemini model for content generation
+    model = _get_genai().GenerativeModel('gemini-2.5-flash')  # Adjust model if needed
+    response = model.generate_content(prompt)
+    return response.text.strip().replace("```sql", "").replace("```", "").strip()
+
+def openai_sql(user_query: str, system_prompt: str) -> str:
+    prompt = f"""
+    You are a SQL assistant. The database schema is as follows:
+
+    {system_prompt}
+
+    User query: {user_query}
+
+    Return only valid SQL query using the schema above. Use backticks for table/column names.
+    """
+    response = _get_openai().ChatCompletion.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You generate SQL queries based on schema."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0
+    )
+    return response['choices'][0]['message']['content'].strip()
+
+def mock_sql(user_query: str, system_prompt: str) -> str:
+    """
+    Offline stand-in for an LLM: queries the first schema table mentioned in the question.
+    MOCK_LLM_LATENCY_MS adds a fake round-trip delay.
+    """
+    delay = float(os.getenv("MOCK_LLM_LATENCY_MS", "0"))
+    if delay:
+        time.sleep(delay / 1000)
+    q = user_query.lower()
+    for line in system_prompt.splitlines():
+        table = line.split(":", 1)[0].strip()
+        if table and (table.lower() in q or table.lower().rstrip("s") in q):
+            if "how many" in q or "count" in q:
+                return f"SELECT COUNT(*) AS `count` FROM `{table}`"
+            return f"SELECT * FROM `{table}` LIMIT 10"
+    return "SELECT 1"
+
+PROVIDERS = {"gemini": gemini_sql, "openai": openai_sql, "mock": mock_sql}
+
+@perf.timed()
+def generate_sql(user_query: str, system_prompt: str, provider: str = "gemini") -> str:
+    """NL -> SQL through `provider`. Failures come back as a `-- Error ...` SQL comment."""
+    try:
+        return PROVIDERS[provider](user_query, system_prompt)
+    except Exception as e:
+        return f"-- Error generating SQL: {e}"
@@ -1,46 +1,28 @@
 import os
-import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
-import google.generativeai as genai  # Correct import
+import perf
+import results
+import sql_agent
+
+# pandas and the Gemini SDK are heavy; pandas is imported in fetch_table_data, the SDK by sql_agent on first use
 
 # Load environment variables
 load_dotenv()
 
-# API Key Configuration for Gemini API
-try:
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except Exception as e:
-    st.error(f"Failed to configure Gemini API. Please check your GEMINI_API_KEY. Error: {e}")
-    st.stop()
-
-# Database connection function
+# Database connection function (one pooled engine per server process)
+@st.cache_resource
 def get_engine():
-    MYSQL_HOST = os.getenv("MYSQL_HOST")
-    MYSQL_PORT = os.getenv("MYSQL_PORT")
-    MYSQL_USER = os.getenv("MYSQL_USER")
-    MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-    MYSQL_DB = os.getenv("MYSQL_DB")
-    
-    url = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
-    engine = create_engine(url)
-    return engine
+    return sql_agent.pooled_engine()
 
 # Fetch database schema
 def fetch_schema():
-    engine = get_engine()
-    with engine.connect() as conn:
-        tables = conn.execute(text("SHOW TABLES")).fetchall()
-        schema_dict = {}
-        for t in tables:
-            table_name = t[0]
-            cols = conn.execute(text(f"SHOW COLUMNS FROM `{table_name}`")).fetchall()
-            schema_dict[table_name] = [c[0] for c in cols]
-        return schema_dict
+    return sql_agent.fetch_schema(get_engine())
 
 # Fetch data from a specific table
 def fetch_table_data(table_name, limit=20):
+    import pandas as pd
     engine = get_engine()
     try:
         with engine.connect() as conn:
@@ -55,43 +37,20 @@ def fetch_table_data(table_name, limit=20):
 def generate_sql(user_query, system_prompt):
     if not user_query or not system_prompt:
         return "-- Please provide a query and schema first."
-
-    # This is the prompt template we'll send to the model
-    prompt = f"""
-    You are a world-class MySQL expert who translates natural language to SQL.
-    Based on the following database schema, write a valid MySQL query to answer the user's request.
-
-    Database Schema:
-    ---
-    {system_prompt}
-    ---
-
-    User Query: "{user_query}"
-
-    SQL Query:
-    """
-
-    try:
-        # Initialize the Gemini model for content generation
-        model = genai.GenerativeModel('gemini-2.5-flash')  # Adjust model if needed
-        # Generate content (SQL query)
-        response = model.generate_content(prompt)
-        # Clean up and return the generated SQL
-        sql = response.text.strip().replace("```sql", "").replace("```", "").strip()
-        return sql
-    except Exception as e:
-        return f"-- Error generating SQL: {e}"
+    return sql_agent.generate_sql(user_query, system_prompt, provider="gemini")
 
 # Execute SQL query against the database
+@perf.timed()
 def execute_query(sql):
     engine = get_engine()
     try:
         with engine.connect() as conn:
             result = conn.execute(text(sql))
-            df = pd.DataFrame(result.fetchall(), columns=result.keys())
-        return df
+            res = results.store(results.from_rows(list(result.keys()), result.fetchall()))
+        perf.count("query_rows", res.num_rows)
+        return res
     except Exception as e:
-        return pd.DataFrame([["Error executing query", str(e)]], columns=["Error", "Detail"])
+        return results.error_result("Error executing query", str(e))
 
 # --- Streamlit UI ---
 
@@ -101,16 +60,26 @@ st.set_page_config(layout="wide")
 # Title of the app
 st.title("SQL Agent Streamlit App with Gemini API")
 
+# The SDK is configured lazily by sql_agent, so check the key up front
+if not os.getenv("GEMINI_API_KEY"):
+    st.warning("GEMINI_API_KEY is not set. Add it to your .env file to generate SQL with Gemini.")
+
 # Initialize session state variables
 if 'schema_text' not in st.session_state:
     st.session_state['schema_text'] = ""
 if 'generated_sql' not in st.session_state:
     st.session_state['generated_sql'] = ""
 if 'last_result' not in st.session_state:
-    st.session_state['last_result'] = pd.DataFrame()
+    st.session_state['last_result'] = None
+if 'perf' not in st.session_state:
+    st.session_state['perf'] = perf.Recorder()
+
+# Stage timings are on by default in the app; PERF_ENABLED=0 turns them off
+perf.enable(os.getenv("PERF_ENABLED", "1") != "0")
+perf.use(st.session_state['perf'])
 
 # Tab Layout
-tab1, tab2 = st.tabs(["SQL Query", "Database Tables"])
+tab1, tab2, tab3 = st.tabs(["SQL Query", "Database Tables", "Performance"])
 
 # --- SQL Query Tab ---
 with tab1:
@@ -125,8 +94,7 @@ with tab1:
         if st.button("Auto-populate schema"):
             with st.spinner("Fetching schema..."):
                 schema = fetch_schema()
-                formatted_schema = "\n".join([f"{t}: {', '.join(cols)}" for t, cols in schema.items()])
-                st.session_state['schema_text'] = formatted_schema
+                st.session_state['schema_text'] = sql_agent.format_schema(schema)
 
         system_prompt = st.text_area("Database Schema / System Prompt", value=st.session_state['schema_text'], height=200)
 
@@ -136,6 +104,8 @@ with tab1:
             with st.spinner("Gemini is thinking..."):
                 generated_sql = generate_sql(user_query, system_prompt)
                 st.session_state['generated_sql'] = generated_sql
+            if generated_sql.startswith("-- Error generating SQL"):
+                st.error(f"Gemini request failed. Please check your GEMINI_API_KEY. {generated_sql[3:]}")
 
         # 4️⃣ SQL Query Display Section
         st.subheader("4️⃣ SQL Query (editable)")
@@ -148,18 +118,27 @@ with tab1:
                 st.warning("SQL query is empty.")
             else:
                 with st.spinner("Executing query..."):
-                    df = execute_query(sql_query)
-                    st.session_state['last_result'] = df
+                    # Drop the previous result first so two never sit in memory at once
+                    st.session_state['last_result'] = None
+                    st.session_state['last_result'] = execute_query(sql_query)
 
     # Divider between UI sections
     st.divider()
 
     # 6️⃣ Query Results Section
     st.subheader("6️⃣ Query Results")
-    if 'last_result' in st.session_state and not st.session_state['last_result'].empty:
-        st.dataframe(st.session_state['last_result'])
+    res = st.session_state['last_result']
+    if res is not None and res.error:
+        st.error(res.error)
+    elif res is not None and res.num_rows:
+        st.dataframe(res.table)
     else:
         st.info("Results will appear here after executing a query.")
+    usage = results.session_usage(st.session_state)
+    st.caption(
+        f"Session memory: {results.format_bytes(usage['resident_bytes'])} in RAM, "
+        f"{results.format_bytes(usage['mapped_bytes'])} memory-mapped"
+    )
 
 # --- Database Tables Tab ---
 with tab2:
@@ -183,3 +162,22 @@ with tab2:
             st.subheader(f"Full table: {table_name}")
             df_full = fetch_table_data(table_name, limit=1000)  # Show full table (limit to 1000 rows for performance)
             st.dataframe(df_full)
+
+# --- Performance Tab ---
+with tab3:
+    st.subheader("Per-stage latency (this session)")
+    # Timings are recorded per browser session (see perf.use above)
+    if not perf.enabled():
+        st.info("Instrumentation is disabled (PERF_ENABLED=0).")
+    else:
+        rec = st.session_state['perf']
+        if st.button("Reset timings"):
+            rec.reset()
+        stats = rec.rows()
+        if stats:
+            st.dataframe(stats, hide_index=True)
+            if rec.counters:
+                st.json(rec.counters)
+            st.download_button("Download (Prometheus text)", rec.to_prometheus(), file_name="sql_agent.prom")
+        else:
+            st.info("Stage timings will appear here after you run something.")
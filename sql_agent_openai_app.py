@@ -1,78 +1,51 @@
 import os
-import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from dotenv import load_dotenv
-import openai
+import perf
+import results
+import sql_agent
+
+# The OpenAI SDK is heavy; sql_agent imports it on first use
 
 # Load environment variables
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-MYSQL_HOST = os.getenv("MYSQL_HOST")
-MYSQL_PORT = os.getenv("MYSQL_PORT")
-MYSQL_USER = os.getenv("MYSQL_USER")
-MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
-MYSQL_DB = os.getenv("MYSQL_DB")
-
-openai.api_key = OPENAI_API_KEY
 
-# Database connection
+# Database connection (one pooled engine per server process)
+@st.cache_resource
 def get_engine():
-    url = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DB}"
-    engine = create_engine(url)
-    return engine
+    return sql_agent.pooled_engine()
 
 # Fetch schema from DB
 def fetch_schema():
-    engine = get_engine()
-    with engine.connect() as conn:
-        tables = conn.execute(text("SHOW TABLES")).fetchall()
-        schema_dict = {}
-        for t in tables:
-            table_name = t[0]
-            cols = conn.execute(text(f"SHOW COLUMNS FROM `{table_name}`")).fetchall()
-            schema_dict[table_name] = [c[0] for c in cols]
-        return schema_dict
+    return sql_agent.fetch_schema(get_engine())
 
 # Generate SQL using OpenAI
 def generate_sql(user_query, system_prompt):
-    prompt = f"""
-    You are a SQL assistant. The database schema is as follows:
-
-    {system_prompt}
-
-    User query: {user_query}
-    
-    Return only valid SQL query using the schema above. Use backticks for table/column names.
-    """
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You generate SQL queries based on schema."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0
-        )
-        sql = response['choices'][0]['message']['content'].strip()
-        return sql
-    except Exception as e:
-        return f"-- Error generating SQL: {e}"
+    return sql_agent.generate_sql(user_query, system_prompt, provider="openai")
 
 # Execute SQL
+@perf.timed()
 def execute_query(sql):
     engine = get_engine()
     try:
         with engine.connect() as conn:
             result = conn.execute(text(sql))
-            df = pd.DataFrame(result.fetchall(), columns=result.keys())
-        return df
+            res = results.store(results.from_rows(list(result.keys()), result.fetchall()))
+        perf.count("query_rows", res.num_rows)
+        return res
     except Exception as e:
-        return pd.DataFrame([["Error executing query", str(e)]], columns=["Error", "Detail"])
+        return results.error_result("Error executing query", str(e))
 
 # --- Streamlit UI ---
 st.title("SQL Agent Streamlit App")
 
+# Stage timings are on by default in the app; PERF_ENABLED=0 turns them off
+if 'perf' not in st.session_state:
+    st.session_state['perf'] = perf.Recorder()
+perf.enable(os.getenv("PERF_ENABLED", "1") != "0")
+perf.use(st.session_state['perf'])
+
 st.subheader("1️⃣ User Query Input (Natural Language)")
 user_query = st.text_area("Enter your query in plain English", "")
 
@@ -81,8 +54,7 @@ if 'schema_text' not in st.session_state:
     st.session_state['schema_text'] = ""
 if st.button("Auto-populate schema"):
     schema = fetch_schema()
-    formatted_schema = "\n".join([f"{t}: {', '.join(cols)}" for t, cols in schema.items()])
-    st.session_state['schema_text'] = formatted_schema
+    st.session_state['schema_text'] = sql_agent.format_schema(schema)
 
 system_prompt = st.text_area("Database Schema / System Prompt", value=st.session_state['schema_text'], height=200)
 
@@ -98,9 +70,36 @@ if st.button("Execute Query"):
     if sql_query.strip() == "":
         st.warning("SQL query is empty.")
     else:
-        df = execute_query(sql_query)
-        st.session_state['last_result'] = df
+        # Drop the previous result first so two never sit in memory at once
+        st.session_state['last_result'] = None
+        st.session_state['last_result'] = execute_query(sql_query)
 
 st.subheader("5️⃣ Query Results")
-if 'last_result' in st.session_state:
-    st.dataframe(st.session_state['last_result'])
+res = st.session_state.get('last_result')
+if res is not None and res.error:
+    st.error(res.error)
+elif res is not None:
+    st.dataframe(res.table)
+usage = results.session_usage(st.session_state)
+st.caption(
+    f"Session memory: {results.format_bytes(usage['resident_bytes'])} in RAM, "
+    f"{results.format_bytes(usage['mapped_bytes'])} memory-mapped"
+)
+
+st.subheader("6️⃣ Performance")
+with st.expander("Per-stage latency (this session)"):
+    # Timings are recorded per browser session (see perf.use above)
+    if not perf.enabled():
+        st.info("Instrumentation is disabled (PERF_ENABLED=0).")
+    else:
+        rec = st.session_state['perf']
+        if st.button("Reset timings"):
+            rec.reset()
+        stats = rec.rows()
+        if stats:
+            st.dataframe(stats, hide_index=True)
+            if rec.counters:
+                st.json(rec.counters)
+            st.download_button("Download (Prometheus text)", rec.to_prometheus(), file_name="sql_agent.prom")
+        else:
+            st.info("Stage timings will appear here after you run something.")
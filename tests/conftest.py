@@ -0,0 +1,4 @@
+import os, sys
+
+# The project is a flat set of scripts; make them importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,38 @@
+import json
+import pytest
+import batch
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1",
+    "  -- comment\n select * from users;",
+    "/* x */ WITH a AS (SELECT 1) SELECT * FROM a",
+    "(SELECT 1) UNION (SELECT 2)",
+    "SHOW TABLES",
+])
+def test_read_only_allowed(sql):
+    assert batch.is_read_only(sql)
+
+@pytest.mark.parametrize("sql", ["DROP TABLE users", "TRUNCATE orders", "select 1; drop table users", "", "-- only a comment"])
+def test_read_only_refused(sql):
+    assert not batch.is_read_only(sql)
+
+def test_write_query_is_refused_not_executed():
+    # The mock provider returns SELECT/SELECT 1; force a write statement through a fake provider
+    batch.sql_agent.PROVIDERS["drop"] = lambda q, s: "DROP TABLE users"
+    try:
+        out = batch.answer({"id": 0, "question": "drop it"}, "", "drop", object(), batch.RateLimiter(0), 5)
+    finally:
+        del batch.sql_agent.PROVIDERS["drop"]
+    assert out["sql"] == "DROP TABLE users"
+    assert out["error"].startswith("Refused")
+
+def test_bad_lines_become_error_records(tmp_path):
+    path = tmp_path / "q.jsonl"
+    path.write_text('"How many users?"\n{"q": "bad"}\nnot json\n42\n{"id": "q2", "question": "list orders"}\n')
+    results = list(batch.run_batch(batch.read_questions(str(path)), "users: id\norders: id", provider="mock"))
+    by_id = {r["id"]: r for r in results}
+    assert len(results) == 5
+    assert by_id[0]["sql"] == "SELECT COUNT(*) AS `count` FROM `users`"
+    assert by_id["q2"]["sql"] == "SELECT * FROM `orders` LIMIT 10"
+    assert all("error" in by_id[i] for i in (1, 2, 3))
+    json.dumps(results)
@@ -0,0 +1,4 @@
+import import_bench
+
+def test_seed_import_within_budget():
+    assert import_bench.check("seed") == []
@@ -0,0 +1,80 @@
+import os
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+import pytest
+import snapshot
+from schema_introspect import TableInfo
+
+def _col(name, data_type):
+    return (name, data_type, True, None, "")
+
+def _round_trip(tmp_path, info, rows, fmt, decimals=None, unsigned=()):
+    arrow = snapshot.arrow_schema(info, decimals or {}, unsigned)
+    time_cols = {c for (c, t, _, _, _) in info.columns if t == "time"}
+    path = os.path.join(tmp_path, f"{info.name}.{fmt}")
+    with ExitStack() as stack:
+        writer = snapshot._open_writer(stack, path, arrow, fmt)
+        writer.write_batch(snapshot._record_batch(rows, arrow, time_cols))
+    out = []
+    for batch in snapshot._read_batches(path, arrow, fmt, 1000):
+        out.extend(batch.to_pylist())
+    return out
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_round_trip_all_types(tmp_path, fmt):
+    info = TableInfo("demo", "t", [
+        _col("id", "bigint"), _col("big", "bigint"), _col("name", "varchar"), _col("price", "decimal"),
+        _col("at", "datetime"), _col("d", "date"), _col("tm", "time"), _col("payload", "blob"),
+    ], ["id"], [])
+    rows = [
+        (1, 2 ** 64 - 1, "a", Decimal("1.50"), datetime(2024, 1, 1, 3), date(2024, 1, 2),
+         timedelta(hours=-1, seconds=5), b"\xff\x00\xfe"),
+        (2, None, "", None, None, None, None, b""),
+        (3, 0, None, Decimal("0.01"), None, None, timedelta(hours=30), None),
+    ]
+    out = _round_trip(tmp_path, info, rows, fmt, {"price": [10, 2]}, ["big"])
+    assert out == [
+        {"id": 1, "big": 2 ** 64 - 1, "name": "a", "price": Decimal("1.50"), "at": datetime(2024, 1, 1, 3),
+         "d": date(2024, 1, 2), "tm": "-00:59:55.000000", "payload": b"\xff\x00\xfe"},
+        {"id": 2, "big": None, "name": "", "price": None, "at": None, "d": None, "tm": None, "payload": b""},
+        {"id": 3, "big": 0, "name": None, "price": Decimal("0.01"), "at": None, "d": None,
+         "tm": "30:00:00.000000", "payload": None},
+    ]
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_round_trip_single_column_nulls(tmp_path, fmt):
+    info = TableInfo("demo", "t", [_col("n", "int")], [], [])
+    out = _round_trip(tmp_path, info, [(1,), (None,), (3,)], fmt)
+    assert out == [{"n": 1}, {"n": None}, {"n": 3}]
+
+def _info(name, fks=()):
+    return TableInfo("demo", name, [], [], [(f"{ref}_id", "demo", ref, "id") for ref in fks])
+
+def test_load_levels_self_reference():
+    infos = {
+        "users": _info("users"),
+        "employees": _info("employees", ["employees", "users"]),
+        "products": _info("products"),
+        "orders": _info("orders", ["users"]),
+        "order_items": _info("order_items", ["orders", "products"]),
+    }
+    order = ["users", "employees", "products", "orders", "order_items"]
+    assert snapshot.load_levels(order, infos) == [
+        ["users", "products"], ["employees", "orders"], ["order_items"],
+    ]
+
+def _manifest():
+    tables = [("users", []), ("orders", ["users"]), ("tree", ["tree"])]
+    return {
+        "schema": "demo", "format": "parquet", "order": [t for t, _ in tables],
+        "tables": [{"name": t, "file": f"{t}.parquet", "rows": 0, "info": vars(_info(t, fks))} for t, fks in tables],
+    }
+
+def test_restore_plan_limits_to_table():
+    assert snapshot.restore_plan(_manifest()) == [["users", "tree"], ["orders"]]
+    assert snapshot.restore_plan(_manifest(), ["orders"]) == [["orders"]]
+
+def test_restore_plan_unknown_table():
+    with pytest.raises(ValueError, match="nosuch"):
+        snapshot.restore_plan(_manifest(), ["nosuch"])